@@ -3,16 +3,19 @@ import os
 import sys
 import subprocess
 import shutil
+import concurrent.futures
 
 def run_command(cmd, cwd, env=None):
-    """Helper to run shell commands"""
+    """Helper to run commands (argv list, no shell)"""
     print(f"Executing: {' '.join(cmd)} in {cwd}")
     # Merge current environment with passed env
-    run_env = os.environ.copy()
+    # (None lets the child inherit os.environ without a copy)
+    run_env = None
     if env:
+        run_env = os.environ.copy()
         run_env.update(env)
         
-    result = subprocess.run(cmd, cwd=cwd, env=run_env, shell=(os.name == 'nt'))
+    result = subprocess.run(cmd, cwd=cwd, env=run_env)
     if result.returncode != 0:
         print(f"Error: Command failed with return code {result.returncode}")
         sys.exit(1)
@@ -30,18 +33,19 @@ def build():
     # 2. Clean previous PyInstaller artifacts
     # (We don't clean SCons artifacts to speed up incremental builds, 
     # unless you want to run 'scons -c')
-    if os.path.exists(dist_dir):
-        print(f"Cleaning {dist_dir}...")
-        shutil.rmtree(dist_dir)
-    if os.path.exists(build_dir):
-        print(f"Cleaning {build_dir}...")
-        shutil.rmtree(build_dir)
+    # Both trees are removed concurrently to overlap the unlink syscalls
+    stale_dirs = [d for d in (dist_dir, build_dir) if os.path.exists(d)]
+    for d in stale_dirs:
+        print(f"Cleaning {d}...")
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as ex:
+        list(ex.map(lambda d: shutil.rmtree(d, ignore_errors=True), stale_dirs))
 
     print(f"Start building from Root: {root_dir}")
 
     # 3. Build C++ Core with SCons
     print("=== Step 1: Building C++ Core with SCons ===")
-    scons_cmd = [sys.executable, "-m", "SCons"]
+    # Compile translation units in parallel
+    scons_cmd = [sys.executable, "-m", "SCons", f"-j{os.cpu_count() or 4}"]
     run_command(scons_cmd, cwd=root_dir)
 
     # 4. Package with PyInstaller
@@ -55,7 +59,10 @@ def build():
         os.path.join(mk_dir, 'logdog.spec')
     ]
     
-    run_command(pyinstaller_cmd, cwd=root_dir)
+    # Keep PyInstaller's cache inside this build tree, so concurrent builds
+    # (e.g. a CI matrix sharing one machine) do not corrupt a shared cache
+    pyinstaller_env = {'PYINSTALLER_CONFIG_DIR': os.path.join(build_dir, 'pyi_cache')}
+    run_command(pyinstaller_cmd, cwd=root_dir, env=pyinstaller_env)
     
     print("=== Build Success! ===")
     
@@ -1,15 +1,106 @@
 # src/action_manager.py
 
-import requests
-import json
 import os
+import queue
 import subprocess
 import platform
+import threading
+import time
+from functools import lru_cache
+from itertools import chain
+
+# JSON string literal of a str, as UTF-8 bytes. orjson is optional and
+# writes the bytes directly; the stdlib escaper is the fallback
+try:
+    from orjson import dumps as _json_string
+except ImportError:
+    from json.encoder import encode_basestring
+
+    def _json_string(s):
+        return encode_basestring(s).encode('utf-8')
+
+# Sentinel pushed by flush() to force the pending batch out immediately
+_FLUSH = object()
+
+def _utf8_len(s):
+    return len(s.encode('utf-8'))
+
+@lru_cache(maxsize=None)
+def _message_template(event_type, keys):
+    # Only a handful of event types and context layouts exist, so each
+    # template is built once and later filled with a single format_map
+    header = f"WATCHDOG EVENT: {event_type}".replace('{', '{{').replace('}', '}}')
+    return "\n".join(chain((header,), (f"{k}: {{{k}}}" for k in keys)))
 
 class ActionManager:
+    # Notification batching: send when MAX_BATCH messages are queued, when no new
+    # message arrived within the coalescing window, or at the latest
+    # config.batch_wait seconds after the first one arrived
+    MAX_BATCH = 50
+    # Coalescing window: short for a lone message, longer once a burst is under way
+    # (a second message in the batch, or the previous batch went out just before)
+    IDLE_WINDOW = 0.1
+    BURST_WINDOW = 0.5
+    # Messages kept while the network is slow; the oldest are dropped beyond this
+    MAX_QUEUE = 1000
+    BATCH_SEPARATOR = "\n\n---\n\n"
+    # Message size limits of the platform APIs; larger batches are split
+    TELEGRAM_MAX_CHARS = 4096
+    WECHAT_MAX_BYTES = 2048
+
+    # Fixed JSON envelope of a WeChat text message; only the content varies
+    _WECHAT_PREFIX = b'{"msgtype":"text","text":{"content":'
+    _WECHAT_SUFFIX = b'}}'
+    # Telegram sendMessage as JSON: {"chat_id":<id>,"text":<text>}
+    _TELEGRAM_PREFIX = b'{"chat_id":'
+    _TELEGRAM_TEXT = b',"text":'
+    _TELEGRAM_SUFFIX = b'}'
+    _JSON_HEADERS = {'Content-Type': 'application/json'}
+    # (connect, read) timeouts in seconds per attempt; retries are left to the adapter
+    HTTP_TIMEOUT = (3, 4)
+
     def __init__(self, config):
         self.config = config
         
+        # Persistent session so TCP/TLS connections are reused across sends;
+        # without any notifier configured, requests is never even imported
+        self.session = self._create_session() if config.get_available_notifiers() else None
+        
+        # Everything fixed by the config is built once: endpoints, the Telegram
+        # envelope up to the text, and the senders in the order they are tried
+        self._telegram_url = f"https://api.telegram.org/bot{config.bot_token}/sendMessage"
+        self._telegram_prefix = (self._TELEGRAM_PREFIX + _json_string(config.chat_id or "") +
+                                 self._TELEGRAM_TEXT)
+        self._wechat_url = f"https://qyapi.weixin.qq.com/cgi-bin/webhook/send?key={config.webhook_key}"
+        senders = {
+            'telegram': (self._send_telegram, self.TELEGRAM_MAX_CHARS, len),
+            'wechat': (self._send_wechat, self.WECHAT_MAX_BYTES, _utf8_len),
+        }
+        self._senders = tuple(senders[p] for p in config.get_notifier_order() if p in senders)
+        
+        # Outgoing notifications are queued and sent by a background worker
+        self._queue = queue.Queue(maxsize=self.MAX_QUEUE)
+        # Messages dropped because the queue was full, and how many were reported
+        self.dropped = 0
+        self._dropped_reported = 0
+        self._worker = threading.Thread(target=self._notify_worker, name="NotifyWorker", daemon=True)
+        self._worker.start()
+        
+    @staticmethod
+    def _create_session():
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        
+        session = requests.Session()
+        # Retries (with backoff, honoring Retry-After on 429) happen inside the adapter;
+        # a send only counts as failed, and falls back to the next platform, after them
+        retry = Retry(total=2, backoff_factor=0.2, status_forcelist=[429, 500, 502, 503, 504],
+                      allowed_methods=frozenset(['POST']), respect_retry_after_header=True,
+                      raise_on_status=False)
+        session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry))
+        return session
+
     def execute_actions(self, event_type, context):
         """
         Execute actions configured for this event type.
@@ -30,46 +121,142 @@ class ActionManager:
             # This is where you could read a config like "TimeoutAction=cmd:shutdown /s /t 60"
             pass
 
+    def flush(self, timeout=None):
+        """
+        Send all queued notifications now and wait until they are delivered.
+        Returns False if they were still pending after timeout seconds.
+        """
+        # One deadline for the whole call; the sentinel never blocks, if the
+        # queue is full it takes the place of the oldest message instead
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self._enqueue(_FLUSH)
+        with self._queue.all_tasks_done:
+            return self._queue.all_tasks_done.wait_for(
+                lambda: not self._queue.unfinished_tasks,
+                None if deadline is None else max(0.0, deadline - time.monotonic()))
+
     def _handle_notifications(self, event_type, context):
-        msg = self._format_message(event_type, context)
-        
-        platforms = self.config.get_available_notifiers()
-        default = self.config.default_ext_notify
-        
-        # Sort to try default first
-        if default in platforms:
-            platforms.remove(default)
-            platforms.insert(0, default)
+        # Nothing to send to, skip formatting entirely
+        if not self.config.get_available_notifiers():
+            return
+        # Only enqueue here, the worker thread does the network I/O
+        self._enqueue(self._format_message(event_type, context))
+
+    def _enqueue(self, msg):
+        """Queue a message without ever blocking the caller"""
+        while True:
+            try:
+                self._queue.put_nowait(msg)
+                return
+            except queue.Full:
+                # Drop the oldest pending message to make room
+                try:
+                    self._queue.get_nowait()
+                    self._queue.task_done()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def _notify_worker(self):
+        """Drain the queue and send messages in batches"""
+        last_sent = float('-inf')
+        while True:
+            items = [self._queue.get()]
+            start = time.monotonic()
+            deadline = start + self.config.batch_wait
+            busy = start - last_sent < self.BURST_WINDOW
+            
+            while len(items) < self.MAX_BATCH and items[-1] is not _FLUSH:
+                # Each arrival reopens the window, so a burst is collected as a
+                # whole while a lone alert goes out almost immediately
+                window = self.BURST_WINDOW if busy or len(items) > 1 else self.IDLE_WINDOW
+                remaining = min(window, deadline - time.monotonic())
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
             
-        for p in platforms:
-            if p == 'telegram':
-                if self._send_telegram(msg): return
-            elif p == 'wechat':
-                if self._send_wechat(msg): return
+            dropped = self.dropped
+            if dropped != self._dropped_reported:
+                print(f"Warning: Notification queue full, dropped {dropped - self._dropped_reported} message(s)")
+                self._dropped_reported = dropped
+            
+            messages = [m for m in items if m is not _FLUSH]
+            if messages:
+                self._send_message(messages)
+                last_sent = time.monotonic()
+            
+            for _ in items:
+                self._queue.task_done()
+
+    def _send_message(self, messages):
+        # Default platform first, bound in __init__
+        for send, limit, size in self._senders:
+            # Whatever this platform did not take falls through to the next one
+            for count, body in self._split_batch(messages, limit, size):
+                if not send(body): break
+                messages = messages[count:]
+            if not messages: return
+
+    def _split_batch(self, messages, limit, size):
+        """
+        Join messages into as few bodies as fit within limit (measured by size),
+        splitting only between messages. Yields (message_count, body).
+        """
+        sep = self.BATCH_SEPARATOR
+        sep_size = size(sep)
+        chunk, used = [], 0
+        for m in messages:
+            m_size = size(m)
+            if m_size > limit:
+                # A single oversized message is cut rather than rejected by the API;
+                # every removed character frees at least one unit of size
+                m = m[:len(m) - (m_size - limit)]
+                m_size = size(m)
+            if chunk and used + sep_size + m_size > limit:
+                yield len(chunk), sep.join(chunk)
+                chunk, used = [], 0
+            used += (sep_size if chunk else 0) + m_size
+            chunk.append(m)
+        if chunk:
+            yield len(chunk), sep.join(chunk)
 
     def _format_message(self, event_type, ctx):
         # Simplified formatter
-        lines = [f"WATCHDOG EVENT: {event_type}"]
-        for k, v in ctx.items():
-            lines.append(f"{k}: {v}")
-        return "\n".join(lines)
+        return _message_template(event_type, tuple(ctx)).format_map(ctx)
 
     def _send_telegram(self, msg):
         try:
-            url = f"https://api.telegram.org/bot{self.config.bot_token}/sendMessage"
-            payload = {'chat_id': self.config.chat_id, 'text': msg}
-            requests.post(url, data=payload, timeout=5)
+            body = self._telegram_prefix + _json_string(msg) + self._TELEGRAM_SUFFIX
+            resp = self.session.post(self._telegram_url, data=body, headers=self._JSON_HEADERS, timeout=self.HTTP_TIMEOUT)
+            if not resp.ok:
+                # Status only, the URL would reveal the token/key
+                print(f"Telegram failed: HTTP {resp.status_code}")
+                return False
             return True
         except Exception as e:
-            print(f"Telegram failed: {e}")
+            # Exception text includes the request URL, i.e. the token/key
+            print(f"Telegram failed: {type(e).__name__}")
             return False
 
     def _send_wechat(self, msg):
         try:
-            url = f"https://qyapi.weixin.qq.com/cgi-bin/webhook/send?key={self.config.webhook_key}"
-            payload = {"msgtype": "text", "text": {"content": msg}}
-            requests.post(url, json=payload, timeout=5)
+            body = self._WECHAT_PREFIX + _json_string(msg) + self._WECHAT_SUFFIX
+            resp = self.session.post(self._wechat_url, data=body, headers=self._JSON_HEADERS, timeout=self.HTTP_TIMEOUT)
+            if not resp.ok:
+                # Status only, the URL would reveal the token/key
+                print(f"WeChat failed: HTTP {resp.status_code}")
+                return False
+            # The webhook reports rejections (rate limit, content too long, ...)
+            # as HTTP 200 with a non-zero errcode in the body
+            errcode = resp.json().get('errcode', 0)
+            if errcode != 0:
+                print(f"WeChat failed: errcode {errcode}")
+                return False
             return True
         except Exception as e:
-            print(f"WeChat failed: {e}")
-            return False
\ No newline at end of file
+            # Exception text includes the request URL, i.e. the token/key
+            print(f"WeChat failed: {type(e).__name__}")
+            return False
@@ -1,93 +1,224 @@
 # src/config_loader.py
 
 import os
-from typing import Set, Dict, List
+import re
+import sys
+import mmap
+import pickle
+import marshal
+import hashlib
+from functools import lru_cache
+from typing import FrozenSet, List, NamedTuple, Tuple
+
+# Parsed configs are cached here, keyed by file path + mtime + size + parser source
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'logdog')
+# Bump when the parsed layout changes so old cache files are ignored
+CACHE_VERSION = 6
+
+# Matches every section header and key=value line of the config in one scan;
+# comments, blank lines and anything else are simply not matched
+_LINE_RE = re.compile(
+    rb'(?m)^[ \t]*(?:\[(?P<sec>.*)\]|(?P<k>[^#\s=][^=\r\n]*?)[ \t]*=[ \t]*(?P<v>.*?))[ \t\r]*$'
+)
+
+class StateRule(NamedTuple):
+    name: str
+    start_node: str
+    transitions: List[Tuple[str, int]] # (target node, timeout ms)
+    description: str
+
+class EntryRule(NamedTuple):
+    name: str
+    node_name: str
+    description: str
+
+def _is_int(s):
+    """True if int(s) would succeed for this (already stripped) token"""
+    s = s[1:] if s[:1] in '+-' else s
+    if s.isdecimal():
+        return True
+    # int() also takes single underscores between digits, e.g. 1_000
+    return (s[:1] != '_' and s[-1:] != '_' and '__' not in s and
+            s.replace('_', '').isdecimal())
+
+@lru_cache(maxsize=None)
+def _parser_fingerprint():
+    """Hash of this module's source, so any parser change invalidates the cache"""
+    try:
+        with open(__file__, 'rb') as f:
+            data = f.read()
+    except OSError:
+        # Frozen builds ship bytecode only; fall back to the parsing code itself
+        data = b''.join(marshal.dumps(fn.__code__) for fn in (
+            WatchdogConfig._parse_file, WatchdogConfig._parse, _is_int, _split_braced))
+        data += _LINE_RE.pattern
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def _split_braced(value):
+    """Split a '{a, b, c}' config value into stripped parts"""
+    # Braces only delimit the value, so trimming the ends is enough
+    return [p.strip() for p in value.strip().strip('{}').split(',')]
 
 class WatchdogConfig:
     def __init__(self):
         self.log_file_path = ""
         self.monitor_interval = 1.0
+        self.debug_log = False
         self.bot_token = None
         self.chat_id = None
         self.webhook_key = None
         self.default_ext_notify = None
-        self.notify_events: Set[str] = {"Timeout", "StateInterrupted"} # Default
+        self.batch_wait = 2.0
+        self.notify_events: FrozenSet[str] = frozenset({"Timeout", "StateInterrupted"}) # Default
+        self._available_notifiers = ()
+        self._notifier_order = ()
         
         # Raw data for C++ engine
-        self.states = [] # list of tuples
-        self.entries = []
+        self.states: List[StateRule] = []
+        self.entries: List[EntryRule] = []
         self.completions = []
 
     def load(self, path):
         if not os.path.exists(path): return False
         
+        cache_file = self._get_cache_file(path)
+        if not (cache_file and self._load_cache(cache_file)):
+            self._parse_file(path)
+            if cache_file:
+                self._save_cache(cache_file)
+        
+        self._finalize()
+        return True
+
+    def _parse_file(self, path):
         current_section = None
-        with open(path, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith('#'): continue
-                if line.startswith('[') and line.endswith(']'):
-                    current_section = line[1:-1].lower()
-                    continue
-                
-                if '=' in line:
-                    k, v = line.split('=', 1)
-                    k, v = k.strip(), v.strip()
-                    self._parse(current_section, k, v)
+        with open(path, 'rb') as f:
+            # mmap cannot map an empty file
+            if os.fstat(f.fileno()).st_size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                    for match in _LINE_RE.finditer(m):
+                        sec = match.group('sec')
+                        if sec is not None:
+                            current_section = sec.decode('utf-8').lower()
+                            continue
+                        
+                        k = match.group('k').decode('utf-8')
+                        v = match.group('v').decode('utf-8')
+                        self._parse(current_section, k, v)
+
+    def _finalize(self):
+        """Freeze lookup data that is consulted for every event"""
+        # Interned names hash once; membership is tested per event
+        self.notify_events = frozenset(sys.intern(e) for e in self.notify_events)
+        
+        res = []
+        if self.bot_token: res.append('telegram')
+        if self.webhook_key: res.append('wechat')
+        self._available_notifiers = tuple(res)
+        
+        # Send order: default platform first, then the rest as configured
+        default = self.default_ext_notify
+        self._notifier_order = tuple(sorted(res, key=lambda p: p != default))
+
+    def _get_cache_file(self, path):
+        """Cache file for this config, or None if caching is disabled"""
+        if os.environ.get('LOGDOG_NOCACHE') == '1':
+            return None
+        st = os.stat(path)
+        # <path hash>-<content hash>.pkl: all entries of one config share the
+        # prefix, so older ones can be found and removed when a new one is saved
+        path_key = hashlib.blake2b(os.path.abspath(path).encode('utf-8'), digest_size=16).hexdigest()
+        raw = f"{CACHE_VERSION}|{_parser_fingerprint()}|{st.st_mtime_ns}|{st.st_size}"
+        key = hashlib.blake2b(raw.encode('utf-8'), digest_size=16).hexdigest()
+        return os.path.join(CACHE_DIR, f"{path_key}-{key}.pkl")
+
+    def _load_cache(self, cache_file):
+        try:
+            with open(cache_file, 'rb') as f:
+                data = pickle.load(f)
+        except Exception:
+            return False
+        self.__dict__.update(data)
         return True
 
+    def _save_cache(self, cache_file):
+        # Write to a temp file first so a crash never leaves a truncated cache
+        try:
+            os.makedirs(CACHE_DIR, mode=0o700, exist_ok=True)
+            tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+            # The cache holds the bot token and webhook key: owner-only from creation
+            fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o600)
+            with open(fd, 'wb') as f:
+                pickle.dump(self.__dict__, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, cache_file)
+        except Exception as e:
+            print(f"Warning: Could not write config cache: {e}")
+            return
+        
+        # Entries for older versions of the same config are never read again
+        name = os.path.basename(cache_file)
+        prefix = name.split('-', 1)[0] + '-'
+        try:
+            for entry in os.scandir(CACHE_DIR):
+                if entry.name.startswith(prefix) and entry.name.endswith('.pkl') and entry.name != name:
+                    os.remove(entry.path)
+        except OSError:
+            pass
+
     def _parse(self, section, k, v):
         if section == 'notification':
             if k == 'Bot_Token': self.bot_token = v
             elif k == 'Chat_ID': self.chat_id = v
             elif k == 'Webhook_Key': self.webhook_key = v
             elif k == 'Default_ExtNotify': self.default_ext_notify = v
+            elif k == 'Batch_Wait': self.batch_wait = float(v)
             elif k == 'NotifyWhen':
-                v = v.replace('{','').replace('}','')
-                self.notify_events = {x.strip() for x in v.split(',') if x.strip()}
+                self.notify_events = {x for x in _split_braced(v) if x}
         
         elif section == 'monitoring':
             if k == 'Log_File_Path': self.log_file_path = v
             elif k == 'Monitor_Interval': self.monitor_interval = float(v)
+            elif k == 'Debug_Log': self.debug_log = v.lower() == 'true'
             
         elif section == 'states':
             # Parse: Name={Start, T1, End1, ... Desc}
-            val = v.replace('{','').replace('}','')
-            parts = [p.strip() for p in val.split(',')]
+            parts = _split_braced(v)
             if len(parts) >= 3:
                 start = parts[0]
                 trans = []
-                idx = 1
                 desc = ""
-                while idx < len(parts):
-                    try:
-                        t_ms = int(parts[idx])
-                        if idx+1 < len(parts):
-                            target = parts[idx+1]
-                            trans.append((target, t_ms))
-                            idx += 2
-                        else: break
-                    except ValueError:
-                        desc = ", ".join(parts[idx:])
+                # Classify each token once: timeout (int) or text (None)
+                tokens = parts[1:]
+                kinds = [int(p) if _is_int(p) else None for p in tokens]
+                # Walk (timeout, target) pairs; text where a timeout is
+                # expected starts the description
+                idx = 0
+                while idx < len(tokens):
+                    t_ms = kinds[idx]
+                    if t_ms is None:
+                        desc = ", ".join(tokens[idx:])
                         break
-                self.states.append((k, start, trans, desc))
+                    if idx + 1 == len(tokens): break
+                    trans.append((tokens[idx+1], t_ms))
+                    idx += 2
+                self.states.append(StateRule(k, start, trans, desc))
                 
         elif section == 'entries':
-            val = v.replace('{','').replace('}','')
-            parts = [p.strip() for p in val.split(',')]
+            parts = _split_braced(v)
             desc = parts[1] if len(parts) > 1 else ""
-            self.entries.append((k, parts[0], desc))
+            self.entries.append(EntryRule(k, parts[0], desc))
             
         elif section == 'completed':
-            val = v.replace('{','').replace('}','')
-            parts = [p.strip() for p in val.split(',')]
+            parts = _split_braced(v)
             self.completions.append(parts[0])
 
     def should_notify(self, event_type):
         return event_type in self.notify_events
 
     def get_available_notifiers(self):
-        res = []
-        if self.bot_token: res.append('telegram')
-        if self.webhook_key: res.append('wechat')
-        return res
\ No newline at end of file
+        # Computed once in _finalize()
+        return self._available_notifiers
+
+    def get_notifier_order(self):
+        # Computed once in _finalize()
+        return self._notifier_order
\ No newline at end of file
@@ -6,6 +6,16 @@
 namespace py = pybind11;
 using namespace logdog;
 
+// Log text is decoded only when Python reads it, and a stray invalid byte in
+// a node name is replaced instead of raising inside the engine callback
+template <std::string EventData::*Member>
+py::str decode_field(const EventData& e) {
+    const std::string& s = e.*Member;
+    PyObject* obj = PyUnicode_DecodeUTF8(s.data(), static_cast<Py_ssize_t>(s.size()), "replace");
+    if (!obj) throw py::error_already_set();
+    return py::reinterpret_steal<py::str>(obj);
+}
+
 PYBIND11_MODULE(_logdog_core, m) {
     m.doc() = "LogDog C++ Core Module";
 
@@ -20,9 +30,9 @@ PYBIND11_MODULE(_logdog_core, m) {
 
     py::class_<EventData>(m, "EventData")
         .def_readonly("type", &EventData::type)
-        .def_readonly("state_name", &EventData::state_name)
-        .def_readonly("node_name", &EventData::node_name)
-        .def_readonly("description", &EventData::description)
+        .def_property_readonly("state_name", &decode_field<&EventData::state_name>)
+        .def_property_readonly("node_name", &decode_field<&EventData::node_name>)
+        .def_property_readonly("description", &decode_field<&EventData::description>)
         .def_readonly("elapsed_ms", &EventData::elapsed_ms);
 
     py::class_<Engine>(m, "Engine")
@@ -31,6 +41,7 @@ PYBIND11_MODULE(_logdog_core, m) {
         .def("set_completion_nodes", &Engine::set_completion_nodes)
         .def("add_entry_node", &Engine::add_entry_node)
         .def("set_callback", &Engine::set_callback)
+        .def("set_debug_log", &Engine::set_debug_log)
         .def("run", &Engine::run, py::call_guard<py::gil_scoped_release>())
         .def("stop", &Engine::stop);
 }
\ No newline at end of file
@@ -1,18 +1,98 @@
 #include "engine.h"
 #include <thread>
 #include <iostream>
+#include <algorithm>
+#include <iterator>
+#include <cctype>
+#include <cstring>
 
 namespace logdog {
 
-Engine::Engine(const std::string& log_path, double interval_sec) 
-    : log_path_(log_path), interval_sec_(interval_sec), running_(false) {
-    
-    // Compile regex once
-    pattern_start_ = std::regex(R"(\[pipeline_data\.name=(.*?)\]\s*\|\s*enter)", std::regex::icase | std::regex::optimize);
-    pattern_complete_ = std::regex(R"(\[pipeline_data\.name=(.*?)\]\s*\|\s*complete)", std::regex::icase | std::regex::optimize);
-    pattern_general_ = std::regex(R"(\[(?:node_name|pipeline_data\.name)=(.*?)\](?!.*(?:list=|result\.name=)))", std::regex::icase | std::regex::optimize);
+namespace {
+
+constexpr std::string_view kPipelineMarker = "[pipeline_data.name=";
+constexpr std::string_view kNodeMarker = "[node_name=";
+
+bool is_space(char c) {
+    return c == ' ' || (c >= '\t' && c <= '\r');
+}
+
+// Position of the next node marker in [from, end), or end if there is none
+const char* find_marker(const char* from, const char* end) {
+    while ((from = static_cast<const char*>(std::memchr(from, '[', end - from)))) {
+        std::string_view rest(from, end - from);
+        if (rest.substr(0, kNodeMarker.size()) == kNodeMarker ||
+            rest.substr(0, kPipelineMarker.size()) == kPipelineMarker) {
+            return from;
+        }
+        ++from;
+    }
+    return end;
+}
+
+// 'word' must be lower case
+bool starts_with_icase(std::string_view s, size_t pos, std::string_view word) {
+    if (s.size() - pos < word.size()) return false;
+    for (size_t i = 0; i < word.size(); ++i) {
+        if (std::tolower(static_cast<unsigned char>(s[pos + i])) != word[i]) return false;
+    }
+    return true;
+}
+
+// Returns the executed node name of a log line, or an empty view if there is none.
+// A single forward scan, no backtracking regex:
+//   1. "[pipeline_data.name=X] | enter" (or "complete") anywhere in the line wins
+//   2. otherwise the first "[node_name=X]" / "[pipeline_data.name=X]", unless it is
+//      followed by a list=/result.name= dump
+// Names end at the first ']' so a capture never runs past its closing bracket.
+std::string_view find_node_name(std::string_view line) {
+    constexpr auto npos = std::string_view::npos;
+
+    // 1. enter/complete markers
+    for (size_t pos = line.find(kPipelineMarker); pos != npos;
+         pos = line.find(kPipelineMarker, pos + 1)) {
+        size_t name_begin = pos + kPipelineMarker.size();
+        size_t close = line.find(']', name_begin);
+        if (close == npos) break; // Later markers cannot be closed either
+
+        size_t p = close + 1;
+        while (p < line.size() && is_space(line[p])) ++p;
+        if (p == line.size() || line[p] != '|') continue;
+        ++p;
+        while (p < line.size() && is_space(line[p])) ++p;
+
+        if (starts_with_icase(line, p, "enter") || starts_with_icase(line, p, "complete")) {
+            return line.substr(name_begin, close - name_begin);
+        }
+    }
+
+    // 2. General markers
+    size_t pipeline_pos = line.find(kPipelineMarker);
+    size_t node_pos = line.find(kNodeMarker);
+    size_t name_begin;
+    if (node_pos < pipeline_pos) {
+        name_begin = node_pos + kNodeMarker.size();
+    } else if (pipeline_pos != npos) {
+        name_begin = pipeline_pos + kPipelineMarker.size();
+    } else {
+        return {};
+    }
+
+    size_t close = line.find(']', name_begin);
+    if (close == npos) return {};
+
+    // General markers followed by a list/result dump are not node executions
+    if (line.find("list=", close + 1) != npos || line.find("result.name=", close + 1) != npos) {
+        return {};
+    }
+    return line.substr(name_begin, close - name_begin);
+}
+
 }
 
+Engine::Engine(const std::string& log_path, double interval_sec) 
+    : log_path_(log_path), interval_sec_(interval_sec), debug_log_(false), running_(false), watcher_(log_path) {}
+
 void Engine::add_state_rule(const std::string& name, const std::string& start_node, 
                            const std::vector<std::pair<std::string, int>>& trans_pairs, 
                            const std::string& desc) {
@@ -38,9 +118,13 @@ void Engine::set_callback(EventCallback cb) {
     callback_ = cb;
 }
 
+void Engine::set_debug_log(bool enabled) {
+    debug_log_ = enabled;
+}
+
 void Engine::stop() {
     running_ = false;
-    cv_.notify_all();
+    watcher_.wake();
 }
 
 void Engine::run() {
@@ -53,40 +137,47 @@ void Engine::run() {
     running_ = true;
     std::cout << "C++ Engine started. Monitoring: " << log_path_ << std::endl;
 
+    // Loop invariants, set up once instead of on every tick / line
+    const int interval_ms = static_cast<int>(interval_sec_ * 1000);
+    std::string node_name; // Reused, keeps its capacity across lines
+    std::vector<EventData> pending; // Events of the current tick, delivered in one callback
+
     while (running_) {
         // 1. Read Lines
-        auto lines = reader.read_new_lines();
+        const auto& lines = reader.read_new_lines();
+
+        // The lines are consecutive slices of one buffer, so markers are located by a
+        // single sweep over the whole block and lines before the next marker are skipped
+        const char* block_end = lines.empty() ? nullptr : lines.back().data() + lines.back().size();
+        const char* next_marker = nullptr;
         
-        for (const auto& line : lines) {
+        for (std::string_view line : lines) {
 
             // std::cout << "[RAW] " << line << std::endl; 
 
-            // Quick filter
-            if (line.find("pipeline_data.name") == std::string::npos && 
-                line.find("node_name") == std::string::npos) {
+            if (!next_marker || next_marker < line.data()) {
+                next_marker = find_marker(line.data(), block_end);
+            }
+            if (next_marker >= line.data() + line.size()) {
                 continue;
             }
 
-            std::smatch match;
-            std::string node_name;
-            
-            if (std::regex_search(line, match, pattern_start_) && match.size() > 1) {
-                node_name = match[1].str();
-            } else if (std::regex_search(line, match, pattern_complete_) && match.size() > 1) {
-                node_name = match[1].str();
-            } else if (std::regex_search(line, match, pattern_general_) && match.size() > 1) {
-                node_name = match[1].str();
-            }
+            std::string_view name = find_node_name(line.substr(next_marker - line.data()));
             
-            if (!node_name.empty()) {
+            if (!name.empty()) {
                 // Trim whitespace
-                node_name.erase(0, node_name.find_first_not_of(" \t\r\n"));
-                node_name.erase(node_name.find_last_not_of(" \t\r\n") + 1);
+                size_t first = name.find_first_not_of(" \t\r\n");
+                if (first == std::string_view::npos) {
+                    name = {};
+                } else {
+                    name = name.substr(first, name.find_last_not_of(" \t\r\n") - first + 1);
+                }
+                node_name.assign(name.data(), name.size());
 
                 // For Debug
                 // std::cout << "[DEBUG] Detected node execution: " << node_name << std::endl;
 
-                if (callback_)
+                if (debug_log_)
                 {
                     // Send a Debug Event
                     EventData debug_evt;
@@ -94,27 +185,36 @@ void Engine::run() {
                     debug_evt.node_name = node_name; 
                     debug_evt.description = "Node Detected: ";
                     debug_evt.elapsed_ms = 0;
-                    callback_(debug_evt);
+                    pending.push_back(std::move(debug_evt));
                 }
 
                 auto events = sm_.process_node(node_name);
-                if (callback_) {
-                    for (const auto& e : events) callback_(e);
-                }
+                pending.insert(pending.end(),
+                               std::make_move_iterator(events.begin()),
+                               std::make_move_iterator(events.end()));
             }
         }
 
         // 2. Check Timeouts
         auto timeouts = sm_.check_timeouts();
-        if (callback_) {
-            for (const auto& e : timeouts) callback_(e);
+        pending.insert(pending.end(),
+                       std::make_move_iterator(timeouts.begin()),
+                       std::make_move_iterator(timeouts.end()));
+
+        // 3. Hand the whole tick to Python at once (one GIL round trip instead of one per event)
+        if (!pending.empty()) {
+            if (callback_) callback_(pending);
+            pending.clear();
         }
 
-        // 3. Sleep
-        std::unique_lock<std::mutex> lk(cv_m_);
-        cv_.wait_for(lk, std::chrono::milliseconds(static_cast<int>(interval_sec_ * 1000)), [this]{
-            return !running_; 
-        });
+        // 4. Sleep until the log changes, stop() is called, the interval elapses
+        //    or the pending timeout is due, whichever comes first
+        int wait_ms = interval_ms;
+        int timeout_ms = sm_.time_until_timeout();
+        if (timeout_ms >= 0 && timeout_ms < wait_ms) {
+            wait_ms = timeout_ms;
+        }
+        watcher_.wait(wait_ms);
     }
     
     reader.close();
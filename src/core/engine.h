@@ -1,16 +1,14 @@
 #pragma once
 #include "state_machine.h"
 #include "log_reader.h"
+#include "file_watcher.h"
 #include <functional>
-#include <regex>
 #include <atomic>
-#include <mutex>
-#include <condition_variable>
 
 namespace logdog {
 
-// Callback signature for Python
-using EventCallback = std::function<void(const EventData&)>;
+// Callback signature for Python, called once per tick with all events of that tick
+using EventCallback = std::function<void(const std::vector<EventData>&)>;
 
 class Engine {
 public:
@@ -24,6 +22,8 @@ public:
     void add_entry_node(const std::string& key, const std::string& node_name, const std::string& desc);
     
     void set_callback(EventCallback cb);
+    // Report every detected node as an EngineLog event (off by default)
+    void set_debug_log(bool enabled);
     
     void run();
     void stop();
@@ -33,14 +33,11 @@ private:
     double interval_sec_;
     StateMachine sm_;
     EventCallback callback_;
+    bool debug_log_;
     std::atomic<bool> running_;
     
-    std::mutex cv_m_;
-    std::condition_variable cv_;
-
-    std::regex pattern_start_;
-    std::regex pattern_complete_;
-    std::regex pattern_general_;
+    // Wakes the run loop on log writes or stop()
+    FileWatcher watcher_;
 };
 
 }
\ No newline at end of file
@@ -0,0 +1,142 @@
+#include "file_watcher.h"
+#include <chrono>
+#include <filesystem>
+
+#if defined(__linux__)
+#include <sys/inotify.h>
+#include <sys/eventfd.h>
+#include <poll.h>
+#include <unistd.h>
+#include <cstdint>
+#elif defined(_WIN32)
+#define WIN32_LEAN_AND_MEAN
+#define NOMINMAX
+#include <windows.h>
+#endif
+
+namespace logdog {
+
+namespace fs = std::filesystem;
+
+FileWatcher::FileWatcher(const std::string& file_path) {
+    fs::path path(file_path);
+    file_name_ = path.filename().string();
+
+    // Watch the directory, the log file itself may be rotated or not exist yet
+    fs::path dir = path.parent_path();
+    if (dir.empty()) dir = ".";
+
+#if defined(__linux__)
+    inotify_fd_ = inotify_init1(IN_NONBLOCK | IN_CLOEXEC);
+    wake_fd_ = eventfd(0, EFD_NONBLOCK | EFD_CLOEXEC);
+    if (inotify_fd_ >= 0 && wake_fd_ >= 0 &&
+        inotify_add_watch(inotify_fd_, dir.c_str(), IN_MODIFY | IN_CREATE | IN_MOVED_TO) >= 0) {
+        native_ = true;
+    }
+#elif defined(_WIN32)
+    HANDLE change = FindFirstChangeNotificationW(dir.wstring().c_str(), FALSE,
+        FILE_NOTIFY_CHANGE_SIZE | FILE_NOTIFY_CHANGE_LAST_WRITE | FILE_NOTIFY_CHANGE_FILE_NAME);
+    // Auto-reset, so a wake is consumed by exactly one wait
+    wake_event_ = CreateEventW(nullptr, FALSE, FALSE, nullptr);
+    if (change != INVALID_HANDLE_VALUE) {
+        change_handle_ = change;
+        native_ = (wake_event_ != nullptr);
+    }
+#endif
+}
+
+FileWatcher::~FileWatcher() {
+#if defined(__linux__)
+    if (inotify_fd_ >= 0) ::close(inotify_fd_);
+    if (wake_fd_ >= 0) ::close(wake_fd_);
+#elif defined(_WIN32)
+    if (change_handle_) FindCloseChangeNotification(change_handle_);
+    if (wake_event_) CloseHandle(wake_event_);
+#endif
+}
+
+#if defined(__linux__)
+// Reads all pending inotify events, returns true if one concerns our file
+bool FileWatcher::drain_events() {
+    alignas(struct inotify_event) char buf[4096];
+    bool changed = false;
+    ssize_t len;
+    while ((len = ::read(inotify_fd_, buf, sizeof(buf))) > 0) {
+        for (char* p = buf; p < buf + len; ) {
+            auto* ev = reinterpret_cast<struct inotify_event*>(p);
+            if ((ev->mask & IN_Q_OVERFLOW) || (ev->len > 0 && file_name_ == ev->name)) {
+                changed = true;
+            }
+            p += sizeof(struct inotify_event) + ev->len;
+        }
+    }
+    return changed;
+}
+#endif
+
+void FileWatcher::wait(int timeout_ms) {
+    if (timeout_ms < 0) timeout_ms = 0;
+
+#if defined(__linux__)
+    if (native_) {
+        auto deadline = std::chrono::steady_clock::now() + std::chrono::milliseconds(timeout_ms);
+        while (true) {
+            auto remaining = std::chrono::duration_cast<std::chrono::milliseconds>(
+                deadline - std::chrono::steady_clock::now()).count();
+            if (remaining < 0) remaining = 0;
+
+            pollfd fds[2] = {{wake_fd_, POLLIN, 0}, {inotify_fd_, POLLIN, 0}};
+            int n = ::poll(fds, 2, static_cast<int>(remaining));
+            if (n <= 0) return; // Timeout (or EINTR, the caller just loops again)
+
+            if (fds[0].revents & POLLIN) {
+                uint64_t value;
+                ssize_t r = ::read(wake_fd_, &value, sizeof(value));
+                (void)r;
+                return;
+            }
+            // Events for other files in the directory keep us waiting
+            if ((fds[1].revents & POLLIN) && drain_events()) return;
+            if (remaining == 0) return;
+        }
+    }
+#elif defined(_WIN32)
+    if (native_) {
+        HANDLE handles[2] = {wake_event_, change_handle_};
+        DWORD res = WaitForMultipleObjects(2, handles, FALSE, static_cast<DWORD>(timeout_ms));
+        if (res == WAIT_OBJECT_0 + 1) {
+            // Re-arm for the next change
+            FindNextChangeNotification(change_handle_);
+        }
+        return;
+    }
+#endif
+
+    std::unique_lock<std::mutex> lk(m_);
+    cv_.wait_for(lk, std::chrono::milliseconds(timeout_ms), [this]{ return woken_; });
+    woken_ = false;
+}
+
+void FileWatcher::wake() {
+#if defined(__linux__)
+    if (native_) {
+        uint64_t one = 1;
+        ssize_t r = ::write(wake_fd_, &one, sizeof(one));
+        (void)r;
+        return;
+    }
+#elif defined(_WIN32)
+    if (native_) {
+        SetEvent(wake_event_);
+        return;
+    }
+#endif
+
+    {
+        std::lock_guard<std::mutex> lk(m_);
+        woken_ = true;
+    }
+    cv_.notify_all();
+}
+
+}
@@ -0,0 +1,45 @@
+#pragma once
+#include <string>
+#include <mutex>
+#include <condition_variable>
+
+namespace logdog {
+
+// Sleeps until the watched log file changes, wake() is called or a timeout expires.
+// Uses inotify on Linux and directory change notifications on Windows. Elsewhere,
+// or when the directory cannot be watched, it falls back to a plain timed wait.
+class FileWatcher {
+public:
+    explicit FileWatcher(const std::string& file_path);
+    ~FileWatcher();
+
+    FileWatcher(const FileWatcher&) = delete;
+    FileWatcher& operator=(const FileWatcher&) = delete;
+
+    // Returns on a change, a wake() or after timeout_ms, whichever comes first
+    void wait(int timeout_ms);
+
+    // Interrupts the current wait; if nobody is waiting, the next wait returns at once
+    void wake();
+
+private:
+    std::string file_name_;
+
+#if defined(__linux__)
+    int inotify_fd_ = -1;
+    int wake_fd_ = -1;
+    bool native_ = false;
+    bool drain_events();
+#elif defined(_WIN32)
+    void* change_handle_ = nullptr;  // HANDLE
+    void* wake_event_ = nullptr;     // HANDLE
+    bool native_ = false;
+#endif
+
+    // Fallback when no native notification is available
+    std::mutex m_;
+    std::condition_variable cv_;
+    bool woken_ = false;
+};
+
+}
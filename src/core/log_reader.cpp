@@ -8,11 +8,15 @@ namespace logdog {
 namespace fs = std::filesystem;
 
 LogReader::LogReader(const std::string& path) 
-    : path_(path), last_pos_(0), initialized_(false) {}
+    : path_(path), last_pos_(0), initialized_(false), idle_reads_(0), consumed_(0) {}
 
 bool LogReader::open() {
     // 只是单纯的打开文件，不做 Seek 操作
-    file_.open(path_, std::ios::in);
+    // Unbuffered (set before open): reads go straight from the OS into data_,
+    // without a second copy through the stream's own buffer
+    file_.rdbuf()->pubsetbuf(nullptr, 0);
+    // Binary: no newline translation, and byte offsets stay exact on Windows
+    file_.open(path_, std::ios::in | std::ios::binary);
     return file_.is_open();
 }
 
@@ -22,68 +26,104 @@ void LogReader::close() {
     }
 }
 
-std::vector<std::string> LogReader::read_new_lines() {
-    std::vector<std::string> lines;
+void LogReader::check_rotation() {
     std::error_code ec;
 
-    // 1. File exist
+    // File removed: drop the handle, it is reopened once the file is back
     if (!fs::exists(path_, ec)) {
         close();
-        return lines;
+        data_.clear();
+        consumed_ = 0;
+        return;
     }
 
-    // 2. Calculate Size
     uintmax_t current_size = fs::file_size(path_, ec);
     if (ec) {
-        return lines; 
+        return;
     }
 
-    // 3. Initial startup logic: Jump to the end of the file
-    if (!initialized_) {
-        last_pos_ = current_size;
-        initialized_ = true;
-        return lines; 
-    }
-
-    // 4. Rotation check: Update postion
+    // Truncated: start over from the beginning
     if (current_size < static_cast<uintmax_t>(last_pos_)) {
         std::cout << "[LogDog] Log rotation detected (Truncated). Resetting position." << std::endl;
         
         close(); 
         last_pos_ = 0;
+        data_.clear();
+        consumed_ = 0;
+    }
+}
+
+const std::vector<std::string_view>& LogReader::read_new_lines() {
+    lines_.clear();
+
+    // Drop the lines handed out last time, keep the unfinished one
+    data_.erase(0, consumed_);
+    consumed_ = 0;
+
+    // 1. Initial startup logic: Jump to the end of the file
+    if (!initialized_) {
+        std::error_code ec;
+        uintmax_t current_size = fs::file_size(path_, ec);
+        if (ec) {
+            return lines_; 
+        }
+        last_pos_ = current_size;
+        initialized_ = true;
+        return lines_; 
     }
 
-    // 5. File open
+    // 2. File open
     if (!file_.is_open()) {
-        if (!open()) return lines;
+        if (!open()) return lines_;
     }
 
-    // 6. Ready
+    // 3. Ready
     file_.clear();
     file_.seekg(last_pos_);
 
-    std::string line;
-    while (std::getline(file_, line)) {
+    // 4. Append raw chunks after the unfinished line
+    std::streamsize total = 0;
+    while (true) {
+        size_t old_size = data_.size();
+        data_.resize(old_size + kReadChunk);
+        file_.read(&data_[old_size], kReadChunk);
+        std::streamsize n = file_.gcount();
+        data_.resize(old_size + static_cast<size_t>(n));
+        total += n;
+        if (n < static_cast<std::streamsize>(kReadChunk)) break;
+    }
+
+    // 5. Split on '\n' without copying; the trailing partial line stays for the next call
+    std::string_view all(data_);
+    size_t pos = 0;
+    size_t nl;
+    while ((nl = all.find('\n', pos)) != std::string_view::npos) {
+        std::string_view line = all.substr(pos, nl - pos);
         // Windows \r
         if (!line.empty() && line.back() == '\r') {
-            line.pop_back();
+            line.remove_suffix(1);
         }
         if (!line.empty()) {
-            lines.push_back(line);
+            lines_.push_back(line);
         }
+        pos = nl + 1;
     }
+    consumed_ = pos;
 
-    // 7. Update read pos
-    if (file_.eof()) {
-        file_.clear();
-    }
-    last_pos_ = file_.tellg();
-
-    if (last_pos_ == std::streampos(-1)) {
-        last_pos_ = current_size;
+    // 6. Update read pos
+    file_.clear();
+    last_pos_ += total;
+    bool got_data = (total > 0);
+
+    // 7. Rotation check: Only stat the file once reads have come back empty for a while
+    if (got_data) {
+        idle_reads_ = 0;
+    } else if (++idle_reads_ >= kStatAfterIdleReads) {
+        idle_reads_ = 0;
+        check_rotation();
     }
 
-    return lines;
+    return lines_;
 }
 
 }
\ No newline at end of file
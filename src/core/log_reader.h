@@ -1,5 +1,6 @@
 #pragma once
 #include <string>
+#include <string_view>
 #include <fstream>
 #include <vector>
 
@@ -9,14 +10,28 @@ class LogReader {
 public:
     LogReader(const std::string& path);
     bool open();
-    std::vector<std::string> read_new_lines();
+    // Complete lines appended since the last call (CR stripped, empty lines skipped).
+    // The views are consecutive slices of one internal buffer, in file order,
+    // and stay valid until the next call.
+    const std::vector<std::string_view>& read_new_lines();
     void close();
 
 private:
+    // Rotation/deletion is only checked after this many reads in a row found no data
+    static constexpr int kStatAfterIdleReads = 5;
+    static constexpr size_t kReadChunk = 1 << 16;
+
+    void check_rotation();
+
     std::string path_;
     std::ifstream file_;
     std::streampos last_pos_;
     bool initialized_;
+    int idle_reads_;
+
+    std::string data_;                      // Bytes read, starting with any unfinished line
+    size_t consumed_;                       // Bytes of data_ handed out by the last call
+    std::vector<std::string_view> lines_;   // Views into data_
 };
 
 }
\ No newline at end of file
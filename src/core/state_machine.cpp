@@ -6,7 +6,7 @@
 namespace logdog {
 
 StateMachine::StateMachine() 
-    : is_active_(false), current_timeout_threshold_(-1) {}
+    : current_edges_(nullptr), is_active_(false), current_timeout_threshold_(-1) {}
 
 void StateMachine::add_state_config(const StateConfig& config) {
     // Flatten the linear rule into graph edges
@@ -24,7 +24,11 @@ void StateMachine::add_state_config(const StateConfig& config) {
         edge.rule_name = config.name;
         edge.description = config.description;
 
-        adjacency_list_[current_source].push_back(edge);
+        NodeEdges& node = adjacency_list_[current_source];
+        node.edges.push_back(edge);
+        if (node.edges.size() == 1 || timeout < node.min_timeout_ms) {
+            node.min_timeout_ms = timeout;
+        }
 
         // Move source forward
         current_source = target;
@@ -42,31 +46,23 @@ void StateMachine::add_entry_node(const std::string& node_name, const std::strin
 void StateMachine::reset_state() {
     is_active_ = false;
     current_node_.clear();
+    current_edges_ = nullptr;
     current_timeout_threshold_ = -1;
 }
 
-int StateMachine::calculate_min_timeout(const std::string& node_name) {
-    if (adjacency_list_.find(node_name) == adjacency_list_.end()) {
-        return -1; // No outgoing transitions, no timeout
-    }
-    
-    const auto& edges = adjacency_list_[node_name];
-    if (edges.empty()) return -1;
-
-    int min_t = std::numeric_limits<int>::max();
-    for (const auto& edge : edges) {
-        if (edge.timeout_ms < min_t) {
-            min_t = edge.timeout_ms;
-        }
-    }
-    return min_t;
+const NodeEdges* StateMachine::find_edges(const std::string& node_name) const {
+    auto it = adjacency_list_.find(node_name);
+    return it == adjacency_list_.end() ? nullptr : &it->second;
 }
 
-void StateMachine::transition_to(const std::string& node_name, const std::chrono::steady_clock::time_point& now) {
+void StateMachine::transition_to(const std::string& node_name, const NodeEdges* edges,
+                                 const std::chrono::steady_clock::time_point& now) {
     current_node_ = node_name;
+    current_edges_ = edges;
     last_transition_time_ = now;
     is_active_ = true;
-    current_timeout_threshold_ = calculate_min_timeout(node_name);
+    // No outgoing transitions, no timeout
+    current_timeout_threshold_ = edges ? edges->min_timeout_ms : -1;
 }
 
 std::vector<EventData> StateMachine::process_node(const std::string& node_name) {
@@ -74,23 +70,25 @@ std::vector<EventData> StateMachine::process_node(const std::string& node_name)
     auto now = std::chrono::steady_clock::now();
 
     // 1. Check Entry Nodes (Highest Priority - Hard Reset)
-    if (entry_nodes_.count(node_name)) {
+    auto entry_it = entry_nodes_.find(node_name);
+    if (entry_it != entry_nodes_.end()) {
+        const EntryInfo& entry = entry_it->second;
         if (is_active_) {
             events.push_back({EventType::StateInterrupted, 
                               "Global", 
                               node_name, 
-                              "Interrupted by Entry: " + entry_nodes_[node_name].name, 
+                              "Interrupted by Entry: " + entry.name, 
                               0});
         }
         
         // Reset and Start fresh
         reset_state();
-        transition_to(node_name, now);
+        transition_to(node_name, find_edges(node_name), now);
         
         events.push_back({EventType::EntryDetected, 
-                          entry_nodes_[node_name].name, 
+                          entry.name, 
                           node_name, 
-                          entry_nodes_[node_name].desc, 
+                          entry.desc, 
                           0});
         return events;
     }
@@ -99,8 +97,8 @@ std::vector<EventData> StateMachine::process_node(const std::string& node_name)
     //    (In the graph model, this means checking if it exists as a key in adjacency_list_)
     if (!is_active_) {
         // If this node is a known source of transitions, we start tracking
-        if (adjacency_list_.count(node_name)) {
-            transition_to(node_name, now);
+        if (const NodeEdges* edges = find_edges(node_name)) {
+            transition_to(node_name, edges, now);
             events.push_back({EventType::StateActivated, 
                               "AutoStart", 
                               node_name, 
@@ -111,10 +109,8 @@ std::vector<EventData> StateMachine::process_node(const std::string& node_name)
     }
 
     // 3. We are active. Check if the new node is a valid transition from current_node_
-    if (adjacency_list_.count(current_node_)) {
-        const auto& edges = adjacency_list_[current_node_];
-        
-        for (const auto& edge : edges) {
+    if (current_edges_) {
+        for (const auto& edge : current_edges_->edges) {
             if (edge.target_node == node_name) {
                 // MATCH FOUND!
                 auto elapsed = std::chrono::duration_cast<std::chrono::milliseconds>(now - last_transition_time_).count();
@@ -127,7 +123,7 @@ std::vector<EventData> StateMachine::process_node(const std::string& node_name)
                                   (int)elapsed});
 
                 // Move state
-                transition_to(node_name, now);
+                transition_to(node_name, find_edges(node_name), now);
 
                 // Log activation of new step (context)
                 events.push_back({EventType::StateActivated, 
@@ -168,8 +164,8 @@ std::vector<EventData> StateMachine::check_timeouts() {
     if (elapsed > current_timeout_threshold_) {
         // Construct a helpful message about what we were waiting for
         std::string waiting_for = "";
-        if (adjacency_list_.count(current_node_)) {
-            for (const auto& edge : adjacency_list_[current_node_]) {
+        if (current_edges_) {
+            for (const auto& edge : current_edges_->edges) {
                 waiting_for += edge.target_node + " ";
             }
         }
@@ -187,4 +183,17 @@ std::vector<EventData> StateMachine::check_timeouts() {
     return events;
 }
 
+int StateMachine::time_until_timeout() const {
+    if (!is_active_ || current_timeout_threshold_ < 0) {
+        return -1;
+    }
+
+    auto elapsed = std::chrono::duration_cast<std::chrono::milliseconds>(
+        std::chrono::steady_clock::now() - last_transition_time_).count();
+
+    // check_timeouts() fires once elapsed exceeds the threshold
+    long long remaining = current_timeout_threshold_ + 1 - elapsed;
+    return remaining > 0 ? static_cast<int>(remaining) : 0;
+}
+
 } // namespace logdog
\ No newline at end of file
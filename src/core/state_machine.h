@@ -18,6 +18,12 @@ struct GraphEdge {
     std::string description; // Description of the rule
 };
 
+// Outgoing transitions of one source node
+struct NodeEdges {
+    std::vector<GraphEdge> edges;
+    int min_timeout_ms = -1; // Minimum timeout of all edges, computed while loading rules
+};
+
 // Configuration input structure (kept for compatibility with Engine)
 struct StateConfig {
     std::string name;
@@ -60,9 +66,12 @@ public:
     // Check timeouts based on current node
     std::vector<EventData> check_timeouts();
 
+    // Milliseconds until check_timeouts() would fire, or -1 if no timeout is pending
+    int time_until_timeout() const;
+
 private:
     // Graph: Source Node -> List of possible transitions
-    std::unordered_map<std::string, std::vector<GraphEdge>> adjacency_list_;
+    std::unordered_map<std::string, NodeEdges> adjacency_list_;
     
     // Global settings
     std::unordered_set<std::string> completion_nodes_;
@@ -71,14 +80,16 @@ private:
 
     // Runtime State (Single State Model)
     std::string current_node_;
+    const NodeEdges* current_edges_;  // Outgoing edges of current_node_, resolved once per transition
     std::chrono::steady_clock::time_point last_transition_time_;
     bool is_active_; 
     int current_timeout_threshold_; // The minimum timeout of all outgoing edges
 
     // Helpers
     void reset_state();
-    void transition_to(const std::string& node_name, const std::chrono::steady_clock::time_point& now);
-    int calculate_min_timeout(const std::string& node_name);
+    const NodeEdges* find_edges(const std::string& node_name) const;
+    void transition_to(const std::string& node_name, const NodeEdges* edges,
+                       const std::chrono::steady_clock::time_point& now);
 };
 
 } // namespace logdog
\ No newline at end of file
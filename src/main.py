@@ -25,15 +25,21 @@ except ImportError as e:
 from config_loader import WatchdogConfig
 from action_manager import ActionManager
 
-# Map C++ Enum to String
-EVENT_MAP = {
-    _logdog_core.EventType.StateActivated: "StateActivated",
-    _logdog_core.EventType.StateCompleted: "StateCompleted",
-    _logdog_core.EventType.Timeout: "Timeout",
-    _logdog_core.EventType.StateInterrupted: "StateInterrupted",
-    _logdog_core.EventType.EntryDetected: "EntryDetected",
-    _logdog_core.EventType.EngineLog: "EngineLog",
+# C++ Enum names in enum order, so int(event.type) indexes straight into the tuples
+EVENT_NAMES = tuple(name for name, _ in sorted(_logdog_core.EventType.__members__.items(),
+                                               key=lambda item: int(item[1])))
+ENGINE_LOG = int(_logdog_core.EventType.EngineLog)
+
+# log_message tag of each event type
+_TAG_BY_NAME = {
+    "StateActivated": "Activated",
+    "StateCompleted": "Completed",
+    "Timeout": "Timeout",
+    "StateInterrupted": "Interrupted",
+    "EntryDetected": "Entry",
+    "EngineLog": "Engine",
 }
+EVENT_TAGS = tuple(_TAG_BY_NAME.get(name, "Event") for name in EVENT_NAMES)
 
 class TerminalColor:
     HEADER = '\033[95m'
@@ -47,6 +53,34 @@ class TerminalColor:
     UNDERLINE = '\033[4m'
     GREY = '\033[90m'
 
+# Color of each log tag, "[Tag]" is wrapped in it once here instead of per line
+TAG_STYLE = {
+    "Engine": TerminalColor.CYAN,
+    "Activated": TerminalColor.GREEN,
+    "Completed": TerminalColor.GREEN,
+    "Interrupted": TerminalColor.WARNING,
+    "Entry": TerminalColor.BLUE,
+    "Timeout": TerminalColor.FAIL,
+    "Event": TerminalColor.ENDC
+}
+TAG_PREFIX = {tag: f"{color}[{tag}]{TerminalColor.ENDC}" for tag, color in TAG_STYLE.items()}
+
+# Seconds between flushes of redirected (block-buffered) stdout
+STDOUT_FLUSH_INTERVAL = 0.05
+
+# (second, "[HH:MM:SS]") of the last log line; bursts within a second share it
+_last_timestamp = (None, "")
+
+def _timestamp():
+    """Current "[HH:MM:SS]", formatted at most once per second"""
+    global _last_timestamp
+    sec = int(time.time())
+    cached_sec, text = _last_timestamp
+    if cached_sec != sec:
+        text = datetime.fromtimestamp(sec).strftime("[%H:%M:%S]")
+        _last_timestamp = (sec, text)
+    return text
+
 def print_logo():
     """
     Prints the Dinergate(Dandelion) (Girls' Frontline) ASCII art.
@@ -81,8 +115,12 @@ class WatchdogService:
         self.config_path = config_path or self._get_default_config_path()
         self.config = WatchdogConfig()
         self.action_mgr = None
+        self._exec = None # Bound action_mgr.execute_actions, called per event
+        self._notify_mask = 0 # Bit i set if events of type i trigger actions
         self.engine = None
         self.running = False
+        self._stopped = threading.Event() # Set by the engine thread when it ends
+        self._flush_stop = threading.Event()
         
         # Setup signal handlers
         signal.signal(signal.SIGINT, self._signal_handler)
@@ -108,6 +146,9 @@ class WatchdogService:
             return False
         
         self.action_mgr = ActionManager(self.config)
+        self._exec = self.action_mgr.execute_actions
+        self._notify_mask = sum(1 << i for i, name in enumerate(EVENT_NAMES)
+                                if self.config.should_notify(name))
         
         # Validate configuration
         if not self.config.states:
@@ -135,18 +176,19 @@ class WatchdogService:
         
         try:
             self.engine = _logdog_core.Engine(log_path, self.config.monitor_interval)
+            self.engine.set_debug_log(self.config.debug_log)
 
             # Configure Engine
-            for name, start, trans, desc in self.config.states:
-                self.engine.add_state_rule(name, start, trans, desc)
+            for rule in self.config.states:
+                self.engine.add_state_rule(rule.name, rule.start_node, rule.transitions, rule.description)
             
             self.engine.set_completion_nodes(self.config.completions)
             
-            for name, node, desc in self.config.entries:
-                self.engine.add_entry_node(name, node, desc)
+            for entry in self.config.entries:
+                self.engine.add_entry_node(entry.name, entry.node_name, entry.description)
 
             # Set Callback
-            self.engine.set_callback(self.on_event)
+            self.engine.set_callback(self.on_events)
             return True
         except Exception as e:
             print(f"Failed to create C++ Engine: {e}")
@@ -157,76 +199,48 @@ class WatchdogService:
         Centralized logging function.
         Handles timestamping, coloring based on tag, and printing.
         """
-        # 1. Define Color Mapping (Style Configuration)
+        # 1. Colored tag, prebuilt from TAG_STYLE (Style Configuration)
         # This keeps the style logic separate from the event logic
-        tag_style_map = {
-            "Engine": TerminalColor.CYAN,
-            "Activated": TerminalColor.GREEN,
-            "Completed": TerminalColor.GREEN,
-            "Interrupted": TerminalColor.WARNING,
-            "Entry": TerminalColor.BLUE,
-            "Timeout": TerminalColor.FAIL,
-            "Event": TerminalColor.ENDC
-        }
-
-        # 2. Get color, default to empty if not found
-        color_code = tag_style_map.get(tag, TerminalColor.ENDC)
-        reset_code = TerminalColor.ENDC
-
-        # 3. Get Timestamp
-        time_str = datetime.now().strftime("[%H:%M:%S]")
-
-        # 4. Format and Print: [Time][Color][Tag][Reset] Message
-        # Example: [12:00:01][\033..][Timeout][\033..] State - Gray_Zone
-        print(f"{time_str}{color_code}[{tag}]{reset_code} {message}")
-
-    def on_event(self, event_data):
-        """Callback from C++ Engine"""
-        e_type_str = EVENT_MAP.get(event_data.type, "Unknown")
-
-        # 1. Dispatch Logic: Decide WHAT to log based on event type
-        if e_type_str == "EngineLog":
-            # Special handling for C++ engine debug output
-            # Assuming description contains the text and node_name contains extra info
-            msg = f"{event_data.description}{event_data.node_name}"
-            self.log_message("Engine", msg)
-
-        elif e_type_str == "StateActivated":
-            msg = f"{e_type_str} - {event_data.state_name}"
-            self.log_message("Activated", msg)
+        tag_str = TAG_PREFIX.get(tag)
+        if tag_str is None:
+            tag_str = f"{TerminalColor.ENDC}[{tag}]{TerminalColor.ENDC}"
 
-        elif e_type_str == "StateCompleted":
-            msg = f"{e_type_str} - {event_data.state_name}"
-            self.log_message("Completed", msg)
+        # 2. Get Timestamp
+        time_str = _timestamp()
 
-        elif e_type_str == "Timeout":
-            msg = f"{e_type_str} - {event_data.state_name}"
-            self.log_message("Timeout", msg)
+        # 3. Format and Print: [Time][Color][Tag][Reset] Message
+        # Example: [12:00:01][\033..][Timeout][\033..] State - Gray_Zone
+        # A single write, so lines from different threads never interleave
+        sys.stdout.write(f"{time_str}{tag_str} {message}\n")
 
-        elif e_type_str == "StateInterrupted":
-            msg = f"{e_type_str} - {event_data.state_name}"
-            self.log_message("Interrupted", msg)
+    def on_events(self, events):
+        """Callback from C++ Engine, receives all events of one engine tick"""
+        on_event = self.on_event
+        for event_data in events:
+            on_event(event_data)
 
-        elif e_type_str == "EntryDetected":
-            msg = f"{e_type_str} - {event_data.state_name}"
-            self.log_message("Entry", msg)
+    def on_event(self, event_data):
+        """Handle a single engine event"""
+        e_type = int(event_data.type)
 
+        # 1. Debug output from the C++ engine (one per detected node when Debug_Log
+        #    is on): fast lane, straight to the log without dispatch
+        if e_type == ENGINE_LOG:
+            # Assuming description contains the text and node_name contains extra info
+            self.log_message("Engine", f"{event_data.description}{event_data.node_name}")
         else:
-            # Fallback for unknown events
-            msg = f"{e_type_str} - {event_data.state_name}"
-            self.log_message("Event", msg)
-
-        # 2. Action Logic: Execute actions (Notifications, Scripts, etc.)
-        context = {
-            "state_name": event_data.state_name,
-            "node_name": event_data.node_name,
-            "description": event_data.description,
-            "elapsed_ms": event_data.elapsed_ms
-        }
-        
-        # Ensure action_mgr exists before calling
-        if self.action_mgr:
-            self.action_mgr.execute_actions(e_type_str, context)
+            # 2. Dispatch Logic: log the event under its tag
+            self.log_message(EVENT_TAGS[e_type], f"{EVENT_NAMES[e_type]} - {event_data.state_name}")
+
+        # 3. Action Logic: Execute actions (Notifications, Scripts, etc.)
+        # Events nobody subscribed to (EngineLog usually) stop here, before any context is built
+        if self._notify_mask & (1 << e_type):
+            self._exec(EVENT_NAMES[e_type], {
+                "state_name": event_data.state_name,
+                "node_name": event_data.node_name,
+                "description": event_data.description,
+                "elapsed_ms": event_data.elapsed_ms
+            })
     
     def run(self) -> bool:
         """Run watchdog service (blocking)"""
@@ -249,10 +263,18 @@ class WatchdogService:
         engine_thread = threading.Thread(target=self._run_engine_thread, name="CppEngineThread")
         engine_thread.start()
         
+        # A terminal is line-buffered already; redirected output is block-buffered,
+        # so many log lines share one write and a flusher keeps it current
+        if not sys.stdout.isatty():
+            threading.Thread(target=self._stdout_flusher, name="StdoutFlusher", daemon=True).start()
+        
         try:
-            # Main thread into a loop
-            while self.running and engine_thread.is_alive():
-                time.sleep(0.5)
+            # Main thread into a loop. The event ends it as soon as the engine exits, which
+            # engine.stop() in shutdown() triggers; the timeout keeps the main thread returning
+            # to Python so Ctrl+C is still handled on Windows, where a blocking wait is not
+            # interruptible, and lets the running flag end it if the engine never started
+            while self.running and not self._stopped.wait(0.5):
+                pass
                 
         except KeyboardInterrupt:
             print("\nKeyboard interrupt received")
@@ -266,7 +288,14 @@ class WatchdogService:
                 engine_thread.join(timeout=2.0)
                 if engine_thread.is_alive():
                     print("Warning: C++ Engine thread did not exit cleanly.")
-        
+
+            # Deliver notifications still waiting in the batch queue
+            if self.action_mgr and not self.action_mgr.flush(timeout=10.0):
+                print("Warning: Some notifications were not delivered before exit.")
+
+            self._flush_stop.set()
+            sys.stdout.flush()
+
         return True
 
     def _run_engine_thread(self):
@@ -276,13 +305,22 @@ class WatchdogService:
         except Exception as e:
             print(f"Error in C++ Engine thread: {e}")
             self.running = False
+        finally:
+            self._stopped.set()
     
+    def _stdout_flusher(self):
+        """Flush buffered stdout periodically until the service stops"""
+        while not self._flush_stop.wait(STDOUT_FLUSH_INTERVAL):
+            sys.stdout.flush()
+
     def shutdown(self):
         """Shutdown watchdog service"""
         if not self.running:
             return
 
         print("Shutting down watchdog service...")
+        # Plain flag only: this runs in the signal handler, on the main thread that may be
+        # inside _stopped.wait() holding the event's lock, so setting the event could deadlock
         self.running = False
         
         if self.engine:
@@ -298,16 +336,16 @@ class WatchdogService:
         print(f"Total Completions: {len(self.config.completions)}")
         
         print("\n[Loaded Rules]")
-        for name, start, trans, desc in self.config.states:
-            print(f"  - {name}: {desc}")
-            print(f"    Start: {start}")
+        for rule in self.config.states:
+            print(f"  - {rule.name}: {rule.description}")
+            print(f"    Start: {rule.start_node}")
             # Format transitions nicely
-            t_str = " -> ".join([f"{t[0]}({t[1]}ms)" for t in trans])
+            t_str = " -> ".join([f"{target}({ms}ms)" for target, ms in rule.transitions])
             print(f"    Path:  {t_str}")
 
         print("\n[Entry Points]")
-        for name, node, desc in self.config.entries:
-            print(f"  - {name}: {node} ({desc})")
+        for entry in self.config.entries:
+            print(f"  - {entry.name}: {entry.node_name} ({entry.description})")
 
 def main():
     """Main entry point"""